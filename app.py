@@ -1,9 +1,12 @@
+import os
 import pandas as pd
 import streamlit as st
 
 from config import CONFIG
 from datetime import datetime
-from engine.engine import get_trade_options, evaluate_scenario
+from engine.engine import get_season_trade_scores, select_trade_options
+from engine.frames import to_data_frame
+from engine.ui import evaluate_scenario, get_streamlit_progress
 from utils.data import get_users
 
 st.title("Trade engine for Sleeper fantasy football leagues")
@@ -48,19 +51,22 @@ with col1:
     with st.form("Generate scenarios"):
         generate_scenarios = st.form_submit_button("Generate scenarios")
         if generate_scenarios:
-            # Get best trade options
-            trade_options = get_trade_options(
+            # Evaluate every trade once; results for any starting week are then a lookup
+            st.session_state["season_trade_scores"] = get_season_trade_scores(
                 league_id=league_id,
                 user_id=user_id,
-                week=week,
                 scoring_type=scoring_type,
                 max_group=max_group,
                 league_users=league_users,
                 exclude_positions=exclude_positions,
+                progress=get_streamlit_progress(),
             )
-            st.session_state["trade_options"] = trade_options
-    print(st.session_state.to_dict())
-    trade_options = st.session_state.get("trade_options", pd.DataFrame({}))
+            st.session_state["season_trade_scores_key"] = (league_id, user_id, scoring_type, max_group, tuple(exclude_positions))
+    # Get best trade options for the selected week, if scores match the current selections
+    if st.session_state.get("season_trade_scores_key") == (league_id, user_id, scoring_type, max_group, tuple(exclude_positions)):
+        trade_options = to_data_frame(select_trade_options(st.session_state["season_trade_scores"], week=week))
+    else:
+        trade_options = pd.DataFrame({})
     st.download_button(
         label="Download this data",
         data=trade_options.to_csv().encode("utf-8"),
@@ -80,6 +86,7 @@ with col2:
                 scoring_type=scoring_type,
                 league_users=league_users,
                 user_display_name=display_name,
+                server_url=os.environ.get("TRADE_SERVER_URL"), # Use a running evaluation server if one is configured
             )
             st.markdown(f"{display_name} score goes from {round(result['user'][0], 2)} to {round(result['user'][1], 2)} (change of {round(result['user'][1] - result['user'][0], 2)})")
             st.markdown(f"{result['other_display_name']} score goes from {round(result['other'][0], 2)} to {round(result['other'][1], 2)} (change of {round(result['other'][1] - result['other'][0], 2)})")
\ No newline at end of file
@@ -0,0 +1,74 @@
+import argparse
+import json
+import subprocess
+import sys
+
+# Modules the headless CLI must not load at import time
+HEAVY_MODULES = ["streamlit", "pandas", "envyaml", "sleeper"]
+
+# Code run in a fresh interpreter, so nothing is already imported
+_MEASURE = f"""
+import json, sys, time
+t0 = time.perf_counter()
+import generate_trades
+elapsed = time.perf_counter() - t0
+print(json.dumps({{
+    "seconds": elapsed,
+    "heavy_modules": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+def measure_import_time(
+    runs: int,
+) -> dict:
+    """Imports generate_trades in fresh interpreters and measures it
+
+    Parameters
+    ----------
+    runs : int
+        Number of fresh interpreters to measure; the fastest run is kept to reduce noise
+
+    Returns
+    -------
+    dict
+        Format {
+            "seconds": Fastest import time of generate_trades
+            "heavy_modules": Heavy modules loaded by the import
+        }
+    """
+    results = [
+        json.loads(subprocess.run([sys.executable, "-c", _MEASURE], capture_output=True, text=True, check=True).stdout)
+        for _ in range(runs)
+    ]
+
+    return {
+        "seconds": min([result["seconds"] for result in results]),
+        "heavy_modules": sorted(set([m for result in results for m in result["heavy_modules"]])),
+    }
+
+def main():
+
+    # Parse arguments
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--budget", help="Maximum import time of generate_trades in seconds", default=0.1)
+    arg_parser.add_argument("--runs", help="Number of fresh interpreters to measure", default=5)
+
+    args = arg_parser.parse_args()
+
+    # Measure
+    result = measure_import_time(runs=int(args.runs))
+    print(f"Importing generate_trades took {round(result['seconds'] * 1000, 1)} ms (budget {round(float(args.budget) * 1000, 1)} ms)")
+
+    # Check bounds
+    failures = []
+    if len(result["heavy_modules"]) > 0:
+        failures.append(f"Imported {', '.join(result['heavy_modules'])}")
+    if result["seconds"] > float(args.budget):
+        failures.append("Over the time budget")
+    for failure in failures:
+        print(f"Error: {failure}")
+    if len(failures) > 0:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
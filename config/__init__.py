@@ -1,6 +1,29 @@
 import os
 
-from envyaml import EnvYAML
+from collections.abc import Mapping
 
 _current_dir = os.path.dirname(__file__)
-CONFIG = EnvYAML(os.path.join(_current_dir, "config.yml"))
\ No newline at end of file
+
+class LazyConfig(Mapping):
+    """Read-only view of config.yml that only imports and parses it on first access, keeping it off the startup path"""
+
+    def __init__(self, path: str):
+        self._path = path
+        self._config = None
+
+    def _load(self):
+        if self._config is None:
+            from envyaml import EnvYAML
+            self._config = EnvYAML(self._path)
+        return self._config
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __iter__(self):
+        return iter(self._load().export())
+
+    def __len__(self):
+        return len(self._load().export())
+
+CONFIG = LazyConfig(os.path.join(_current_dir, "config.yml"))
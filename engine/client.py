@@ -0,0 +1,154 @@
+import json
+import urllib.request
+
+from typing import List
+
+def post(
+    server_url: str,
+    path: str,
+    query: dict,
+):
+    """Sends a JSON query to a running evaluation server (see engine/server.py)
+
+    Parameters
+    ----------
+    server_url : str
+        The server address, e.g. http://127.0.0.1:8765
+    path : str
+        The query path, e.g. /score_trade
+    query : dict
+        The query body
+
+    Returns
+    -------
+    Any
+        The decoded JSON response
+    """
+    request = urllib.request.Request(
+        f"{server_url.rstrip('/')}{path}",
+        data=json.dumps(query).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+def get_rosters(
+    server_url: str,
+    league_id: str,
+    scoring_type: str,
+) -> List[dict]:
+    """Gets a league's rosters from the evaluation server
+
+    Parameters
+    ----------
+    server_url : str
+        The server address, e.g. http://127.0.0.1:8765
+    league_id : str
+        The league id number
+    scoring_type : str
+        The league's scoring method; one of "PPR", "Half PPR", "Standard"
+
+    Returns
+    -------
+    List[dict]
+        List of rosters; keys owner_id, display_name, players (list of player_id, name, position)
+    """
+    return post(server_url, "/rosters", {
+        "league_id": league_id,
+        "scoring_type": scoring_type,
+    })
+
+def score_trade(
+    server_url: str,
+    league_id: str,
+    scoring_type: str,
+    week: int,
+    user_id: str,
+    other_id: str,
+    user_sends: List[str],
+    other_sends: List[str],
+) -> dict:
+    """Scores a trade on the evaluation server
+
+    Parameters
+    ----------
+    server_url : str
+        The server address, e.g. http://127.0.0.1:8765
+    league_id : str
+        The league id number
+    scoring_type : str
+        The league's scoring method; one of "PPR", "Half PPR", "Standard"
+    week : int
+        The current week of the season; used for calculating projected scores for remaining games
+    user_id : str
+        The user id number or display name
+    other_id : str
+        The other user's id number or display name
+    user_sends : List[str]
+        List of player_id the user sends
+    other_sends : List[str]
+        List of player_id the other user sends
+
+    Returns
+    -------
+    dict
+        Format {
+            "user": List of (original projected score, post-trade projected score)
+            "other": List of (original projected score, post-trade projected score)
+        }
+    """
+    return post(server_url, "/score_trade", {
+        "league_id": league_id,
+        "scoring_type": scoring_type,
+        "week": week,
+        "user_id": user_id,
+        "other_id": other_id,
+        "user_sends": user_sends,
+        "other_sends": other_sends,
+    })
+
+def get_best_trades(
+    server_url: str,
+    league_id: str,
+    scoring_type: str,
+    week: int,
+    user_id: str,
+    player_id: str,
+    max_group: int = 1,
+    exclude_positions: List[str] = [],
+) -> List[dict]:
+    """Gets the best trades involving one player from the evaluation server
+
+    Parameters
+    ----------
+    server_url : str
+        The server address, e.g. http://127.0.0.1:8765
+    league_id : str
+        The league id number
+    scoring_type : str
+        The league's scoring method; one of "PPR", "Half PPR", "Standard"
+    week : int
+        The current week of the season; used for calculating projected scores for remaining games
+    user_id : str
+        The user id number or display name
+    player_id : str
+        The player to send or receive
+    max_group : int, optional
+        The maximum size of a trade group, by default 1
+    exclude_positions : List[str], optional
+        Positions to exclude from consideration for trades, by default []
+
+    Returns
+    -------
+    List[dict]
+        Rows describing the best trade options for the user, best first
+    """
+    return post(server_url, "/best_trades", {
+        "league_id": league_id,
+        "scoring_type": scoring_type,
+        "week": week,
+        "user_id": user_id,
+        "player_id": player_id,
+        "max_group": max_group,
+        "exclude_positions": exclude_positions,
+    })
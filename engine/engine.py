@@ -1,76 +1,41 @@
-import pandas as pd
-import streamlit as st
 import sys
 import time
 
 from config import CONFIG
-from typing import List
+from typing import Callable, List
 from utils.combinatorics import get_combos
 from utils.data import get_roster_data, get_all_player_projections, get_all_players, get_users
-from utils.scoring import add_projected_scores, get_projected_score
+from utils.scoring import add_projected_scores, get_relevant_free_agents, get_suffix_scores, get_weekly_projected_scores
 from utils.timing import get_formatted_time
 
-def get_trade_options(
-    league_id: str,
-    user_id: str,
-    week: int,
+def get_global_data(
     scoring_type: str,
-    max_group: int,
-    league_users: List[dict] = None,
-    exclude_positions: List[str] = [],
-    status: str = "streamlit",
-) -> pd.DataFrame:
-    """Gets a data frame of the best trade options for the user given the situation
+    all_players: dict = None,
+) -> dict:
+    """Loads and reshapes the league-independent data (all NFL players and full-season projections)
 
     Parameters
     ----------
-    league_id : str
-        The league id number
-    user_id : str
-        The user id number
-    week : int
-        The current week of the season; used for calculating projected scores for remaining games
     scoring_type : str
         The league's scoring method; one of "PPR", "Half PPR", "Standard"
-    league_users : List[dict]
-        Information about the users in the league; keys user_id and display_name
-    max_group : int
-        The maximum size of a trade group (e.g. if 2, trades can be of 1 or 2 players per team)
-    exclude_positions : List[str], optional
-        Positions to exclude from consideration for trades, by default []
-    status : str, optional
-        Destination to output status (streamlit or terminal), by default streamlit
+    all_players : dict, optional
+        Preloaded output of get_all_players, so several scoring types can share one copy, loaded if not passed in, by default None
 
     Returns
     -------
-    pd.DataFrame
-        Data frame describing the best trade options for the user
+    dict
+        Format {
+            "projections": Dictionary mapping player_id to list of week, proj_score, position
+            "all_players": Dictionary of all NFL players; structure {player_id: {position: str, name: str}}
+        }
     """
 
-    # Process arguments
-    if league_users is None:
-        league_users = get_users(league_id)
-    if not (user_id in [user["user_id"] for user in league_users]): # If user not in league, must have passed in display name, so get actual ID
-        try:
-            user_id = [user["user_id"] for user in league_users if user["display_name"] == user_id][0]
-        except:
-            assert 0 == 1, "Error: Invalid user name / ID"
-    
-
-    t0 = time.time()
+    # Get player projections for the whole season (starting week is applied later through suffix scores)
+    projections_season = get_all_player_projections(week=1, scoring_type=scoring_type)
 
-    # Get player projections
-    projections_season = get_all_player_projections(week=week, scoring_type=scoring_type)
-    # Filter to current/future projections
-    projections_season = {
-        player_id: [
-            projection for projection in projections_season[player_id] if projection["week"] >= week
-        ]
-        for player_id in projections_season.keys()
-    }
-    
     # Get all players
-    all_players = get_all_players()
+    if all_players is None:
+        all_players = get_all_players()
 
     # Add position to projections
     projections_season = {
@@ -91,14 +56,53 @@ def get_trade_options(
         if any([week["position"] in CONFIG["rosters"]["single_positions"] for week in v])
     }
 
+    return {
+        "projections": projections_season,
+        "all_players": all_players,
+    }
+
+def get_league_context(
+    league_id: str,
+    scoring_type: str,
+    global_data: dict = None,
+) -> dict:
+    """Loads and reshapes the full-season data for a league, with rest-of-season roster scores for every starting week
+
+    Parameters
+    ----------
+    league_id : str
+        The league id number
+    scoring_type : str
+        The league's scoring method; one of "PPR", "Half PPR", "Standard"
+    global_data : dict, optional
+        Preloaded output of get_global_data for the scoring type, loaded if not passed in, by default None
+
+    Returns
+    -------
+    dict
+        Format {
+            "projections": Dictionary mapping player_id to list of week, proj_score, position
+            "all_players": Dictionary of all NFL players; structure {player_id: {position: str, name: str}}
+            "rosters": List of rosters; keys owner_id, players, suffix_scores
+            "free_agents": List of player_id of free agents in the league
+        }
+    """
+
+    # Get league-independent data
+    if global_data is None:
+        global_data = get_global_data(scoring_type=scoring_type)
+    projections_season = global_data["projections"]
+    all_players = global_data["all_players"]
+
     # Get roster data
     rosters = get_roster_data(league_id)
-    # Get free agents
+    # Get free agents (only those who could ever start, so each evaluation scans a short list)
     free_agents = [
         player_id for player_id in all_players.keys() if not any([
             player_id in roster["players"] for roster in rosters
         ])
     ]
+    free_agents = get_relevant_free_agents(free_agents=free_agents, projections=projections_season)
     # Add projected scores to rosters
     rosters = add_projected_scores(
         rosters=rosters,
@@ -106,6 +110,97 @@ def get_trade_options(
         free_agents=free_agents,
     )
 
+    return {
+        "projections": projections_season,
+        "all_players": all_players,
+        "rosters": rosters,
+        "free_agents": free_agents,
+    }
+
+def get_season_trade_scores(
+    league_id: str,
+    user_id: str,
+    scoring_type: str,
+    max_group: int,
+    league_users: List[dict] = None,
+    exclude_positions: List[str] = [],
+    progress: Callable[[float, str], None] = None,
+    global_data: dict = None,
+    shard: int = 0,
+    num_shards: int = 1,
+    league_context: dict = None,
+    player_id: str = None,
+    first_week: int = 1,
+) -> dict:
+    """Evaluates every trade for the user once, keeping rest-of-season scores for every starting week from first_week on
+
+    Parameters
+    ----------
+    league_id : str
+        The league id number
+    user_id : str
+        The user id number
+    scoring_type : str
+        The league's scoring method; one of "PPR", "Half PPR", "Standard"
+    max_group : int
+        The maximum size of a trade group (e.g. if 2, trades can be of 1 or 2 players per team)
+    league_users : List[dict]
+        Information about the users in the league; keys user_id and display_name
+    exclude_positions : List[str], optional
+        Positions to exclude from consideration for trades, by default []
+    progress : Callable[[float, str], None], optional
+        Called with the fraction complete and a status message before each trade is evaluated
+        (e.g. print_progress for the terminal), no status is output if None, by default None
+    global_data : dict, optional
+        Preloaded output of get_global_data for the scoring type, loaded if not passed in, by default None
+    shard : int, optional
+        Index of the shard of the trade space to evaluate, by default 0
+    num_shards : int, optional
+        Number of shards the trade space is split into; trade number t is evaluated by shard t % num_shards, by default 1
+    league_context : dict, optional
+        Preloaded output of get_league_context, loaded if not passed in, by default None
+    player_id : str, optional
+        Only evaluate trades where this player is sent or received, by default None
+    first_week : int, optional
+        The earliest starting week the scores are needed for; earlier weeks are not scored, by default 1
+
+    Returns
+    -------
+    dict
+        Format {
+            "first_week": The earliest starting week scored
+            "user_display_name": The user's display name
+            "user_suffix_scores": The user's current rest-of-season projected score by starting week
+            "trades": List of trades that are favorable for at least one starting week from first_week on; keys index, Sends, To, Receives,
+                user_suffix_scores, other_orig_suffix_scores, other_suffix_scores
+        }
+    """
+
+    # Process arguments
+    assert 0 <= shard < num_shards, f"Error: Shard {shard} is not between 0 and {num_shards - 1}"
+    if league_users is None:
+        league_users = get_users(league_id)
+    if not (user_id in [user["user_id"] for user in league_users]): # If user not in league, must have passed in display name, so get actual ID
+        try:
+            user_id = [user["user_id"] for user in league_users if user["display_name"] == user_id][0]
+        except:
+            assert 0 == 1, "Error: Invalid user name / ID"
+    
+
+    t0 = time.time()
+
+    # Get league data
+    if league_context is None:
+        league_context = get_league_context(league_id=league_id, scoring_type=scoring_type, global_data=global_data)
+    all_players = league_context["all_players"]
+    rosters = league_context["rosters"]
+    free_agents = league_context["free_agents"]
+    # Drop projections before the first week needed
+    projections_season = {
+        k: [projection for projection in v if projection["week"] >= first_week]
+        for k, v in league_context["projections"].items()
+    }
+
     # Get user roster and other rosters
     user_roster = [roster for roster in rosters if roster["owner_id"] == user_id][0]
     rosters = [roster for roster in rosters if roster["owner_id"] != user_id]
@@ -113,72 +208,183 @@ def get_trade_options(
     # Save user display name
     user_display_name = [u["display_name"] for u in league_users if u["user_id"] == user_id][0]
 
-    trade_options = []
+    trades = []
+    trade_index = -1
     # Loop through players on owner's roster
     combos = get_combos([p for p in user_roster["players"] if not all_players[p]["position"] in exclude_positions], max_group=max_group)
-    if status == "streamlit":
-        progress_bar = st.progress(0)
     for i, players in enumerate(combos):
         # Loop through other rosters
         for j, other_roster in enumerate(rosters):
             # Loop through players in that other roster
             other_combos = get_combos([p for p in other_roster["players"] if not all_players[p]["position"] in exclude_positions], max_group=max_group)
             for k, other_players in enumerate(other_combos):
-                if status == "streamlit":
-                    progress_bar.progress(
-                        i / len(combos) + j / len(combos) / len(rosters) + k / len(combos) / len(rosters) / len(other_combos),
-                        text=f"({get_formatted_time(time.time() - t0)}) ({round((i / len(combos) + j / len(combos) / len(rosters) + k / len(combos) / len(rosters) / len(other_combos)) * 100, 2)}%) Evaluating {', '.join([all_players[p]['name'] for p in players])} to {[l['display_name'] for l in league_users if l['user_id'] == other_roster['owner_id']][0]} for {', '.join([all_players[p]['name'] for p in other_players])}",
+                # Skip trades that belong to another shard
+                trade_index += 1
+                if trade_index % num_shards != shard:
+                    continue
+                # Skip trades without the requested player
+                if player_id is not None and not (player_id in players or player_id in other_players):
+                    continue
+                if progress is not None:
+                    fraction = i / len(combos) + j / len(combos) / len(rosters) + k / len(combos) / len(rosters) / len(other_combos)
+                    progress(
+                        fraction,
+                        f"({get_formatted_time(time.time() - t0)}) ({round(fraction * 100, 2)}%) Evaluating {', '.join([all_players[p]['name'] for p in players])} to {[l['display_name'] for l in league_users if l['user_id'] == other_roster['owner_id']][0]} for {', '.join([all_players[p]['name'] for p in other_players])}",
                     )
-                elif status == "terminal":
-                    sys.stdout.write("\033[K") # Clear to the end of line
-                    print(f"({get_formatted_time(time.time() - t0)}) ({round((i / len(combos) + j / len(combos) / len(rosters) + k / len(combos) / len(rosters) / len(other_combos)) * 100, 2)}%) Evaluating {', '.join([all_players[p]['name'] for p in players])} to {[l['display_name'] for l in league_users if l['user_id'] == other_roster['owner_id']][0]} for {', '.join([all_players[p]['name'] for p in other_players])}", end="\r")
                 # Get proposed rosters with the trade
                 proposed_user_roster = (set(user_roster["players"]) - set(players)).union(set(other_players))
                 proposed_other_roster = (set(other_roster["players"]) - set(other_players)).union(set(players))
-                # Save original projected scores
-                user_orig_projection = user_roster["proj_score"]
-                other_orig_projection = other_roster["proj_score"]
-                # Get projected scores with the trade
-                user_proposed_projection = get_projected_score(
+                # Get projected scores with the trade for every starting week
+                user_proposed_projection = get_suffix_scores(get_weekly_projected_scores(
                     players=list(proposed_user_roster) + free_agents,
                     projections=projections_season,
-                )
-                other_proposed_projection = get_projected_score(
+                ), first_week=first_week)
+                other_proposed_projection = get_suffix_scores(get_weekly_projected_scores(
                     players=list(proposed_other_roster) + free_agents,
                     projections=projections_season,
-                )
-                # If the trade is beneficial for the user and not harmful for the other
-                if user_proposed_projection > user_orig_projection and other_proposed_projection >= other_orig_projection:
+                ), first_week=first_week)
+                # Keep the trade if it is favorable for at least one starting week
+                if any([
+                    user_proposed_projection[w] > user_roster["suffix_scores"][w] and other_proposed_projection[w] >= other_roster["suffix_scores"][w]
+                    for w in user_proposed_projection.keys()
+                ]):
                     # Save display names for other user involved in the trade
                     other_display_name = [u["display_name"] for u in league_users if u["user_id"] == other_roster["owner_id"]][0]
-                    trade_options.append({
+                    trades.append({
+                        "index": trade_index,
                         "Sends": ", ".join([f"{all_players[player]['name']} ({all_players[player]['position']})" for player in players]),
                         "To": other_display_name,
                         "Receives": ", ".join([f"{all_players[other_player]['name']} ({all_players[other_player]['position']})" for other_player in other_players]),
-                        f"{user_display_name} Previous Projection": round(user_orig_projection / (18 - week), 2),
-                        f"{user_display_name} Trade Projection": round(user_proposed_projection / (18 - week), 2),
-                        "Other Previous Projection": round(other_orig_projection / (18 - week), 2),
-                        "Other Trade Projection": round(other_proposed_projection / (18 - week), 2),
+                        "user_suffix_scores": user_proposed_projection,
+                        "other_orig_suffix_scores": other_roster["suffix_scores"],
+                        "other_suffix_scores": other_proposed_projection,
                     })
 
+    return {
+        "first_week": first_week,
+        "user_display_name": user_display_name,
+        "user_suffix_scores": user_roster["suffix_scores"],
+        "trades": trades,
+    }
+
+def merge_season_trade_scores(
+    partial_trade_scores: List[dict],
+) -> dict:
+    """Combines the season trade scores of every shard into the scores of a single unsharded run
+
+    Parameters
+    ----------
+    partial_trade_scores : List[dict]
+        Outputs of get_season_trade_scores, one for each shard
+
+    Returns
+    -------
+    dict
+        Season trade scores in the same format and trade order as an unsharded get_season_trade_scores
+    """
+    assert len(set([p["user_display_name"] for p in partial_trade_scores])) == 1, "Error: Shards are from different users"
+    assert len(set([p["first_week"] for p in partial_trade_scores])) == 1, "Error: Shards start at different weeks"
+
+    # Restore the order of the unsharded search so ties sort identically
+    trades = sorted(
+        [trade for p in partial_trade_scores for trade in p["trades"]],
+        key=lambda trade: trade["index"],
+    )
+
+    return {
+        "first_week": partial_trade_scores[0]["first_week"],
+        "user_display_name": partial_trade_scores[0]["user_display_name"],
+        "user_suffix_scores": partial_trade_scores[0]["user_suffix_scores"],
+        "trades": trades,
+    }
+
+def get_trade_option_columns(
+    user_display_name: str,
+) -> List[str]:
+    """Gets the column names of the trade options rows
+
+    Parameters
+    ----------
+    user_display_name : str
+        The user's display name
+
+    Returns
+    -------
+    List[str]
+        Column names, in order
+    """
+    return [
+        "Sends",
+        "To",
+        "Receives",
+        f"{user_display_name} Previous Projection",
+        f"{user_display_name} Trade Projection",
+        "Other Previous Projection",
+        "Other Trade Projection",
+    ]
+
+def select_trade_options(
+    season_trade_scores: dict,
+    week: int,
+) -> List[dict]:
+    """Gets the best trade options for a starting week from precomputed season trade scores
+
+    Parameters
+    ----------
+    season_trade_scores : dict
+        Output of get_season_trade_scores
+    week : int
+        The current week of the season; used for calculating projected scores for remaining games; at least the
+        first_week the scores were computed from
+
+    Returns
+    -------
+    List[dict]
+        Rows describing the best trade options for the user, best first
+    """
+    assert week >= season_trade_scores["first_week"], f"Error: Trade scores start at week {season_trade_scores['first_week']}"
+
+    user_display_name = season_trade_scores["user_display_name"]
+    user_orig_projection = season_trade_scores["user_suffix_scores"][week]
+
+    trade_options = []
+    for trade in season_trade_scores["trades"]:
+        user_proposed_projection = trade["user_suffix_scores"][week]
+        other_orig_projection = trade["other_orig_suffix_scores"][week]
+        other_proposed_projection = trade["other_suffix_scores"][week]
+        # If the trade is beneficial for the user and not harmful for the other
+        if user_proposed_projection > user_orig_projection and other_proposed_projection >= other_orig_projection:
+            trade_options.append(dict(zip(get_trade_option_columns(user_display_name), [
+                trade["Sends"],
+                trade["To"],
+                trade["Receives"],
+                round(user_orig_projection / (18 - week), 2),
+                round(user_proposed_projection / (18 - week), 2),
+                round(other_orig_projection / (18 - week), 2),
+                round(other_proposed_projection / (18 - week), 2),
+            ])))
+
     # Sort the trade options by the size of the advantage it gives the user
-    trade_options = pd.DataFrame(trade_options)
-    if len(trade_options) > 0:
-        trade_options["diff"] = trade_options[f"{user_display_name} Trade Projection"] - trade_options[f"{user_display_name} Previous Projection"]
-        trade_options = trade_options.sort_values("diff", ascending=False, ignore_index=True)
-        trade_options = trade_options.drop(columns="diff")
+    trade_options = sorted(
+        trade_options,
+        key=lambda option: option[f"{user_display_name} Trade Projection"] - option[f"{user_display_name} Previous Projection"],
+        reverse=True,
+    )
 
     return trade_options
 
-def evaluate_scenario(
+def get_trade_options(
     league_id: str,
     user_id: str,
     week: int,
     scoring_type: str,
-    league_users: List[dict],
-    user_display_name: str,
-):
-    """_summary_
+    max_group: int,
+    league_users: List[dict] = None,
+    exclude_positions: List[str] = [],
+    progress: Callable[[float, str], None] = None,
+    global_data: dict = None,
+) -> List[dict]:
+    """Gets the best trade options for the user given the situation
 
     Parameters
     ----------
@@ -192,101 +398,109 @@ def evaluate_scenario(
         The league's scoring method; one of "PPR", "Half PPR", "Standard"
     league_users : List[dict]
         Information about the users in the league; keys user_id and display_name
-    user_display_name : str
-        The user's display name
+    max_group : int
+        The maximum size of a trade group (e.g. if 2, trades can be of 1 or 2 players per team)
+    exclude_positions : List[str], optional
+        Positions to exclude from consideration for trades, by default []
+    progress : Callable[[float, str], None], optional
+        Called with the fraction complete and a status message before each trade is evaluated
+        (e.g. print_progress for the terminal), no status is output if None, by default None
+    global_data : dict, optional
+        Preloaded output of get_global_data for the scoring type, loaded if not passed in, by default None
 
     Returns
     -------
-    dict
-        Format {
-            "user": Tuple of (original projected score, post-trade projected score)
-            "other": Tuple of (original projected score, post-trade projected score)
-            "other_display_name": Other user's display name
-        }
+    List[dict]
+        Rows describing the best trade options for the user, best first
     """
 
-    # Get player projections
-    projections_season = get_all_player_projections(week=week, scoring_type=scoring_type)
-    # Filter to current/future projections
-    projections_season = {
-        player_id: [
-            projection for projection in projections_season[player_id] if projection["week"] >= week
-        ]
-        for player_id in projections_season.keys()
-    }
-    
-    # Get all players
-    all_players = get_all_players()
+    season_trade_scores = get_season_trade_scores(
+        league_id=league_id,
+        user_id=user_id,
+        scoring_type=scoring_type,
+        max_group=max_group,
+        league_users=league_users,
+        exclude_positions=exclude_positions,
+        progress=progress,
+        global_data=global_data,
+        first_week=week,
+    )
 
-    # Add position to projections
-    projections_season = {
-        player_id: [
-            {
-                "week": projection["week"],
-                "proj_score": 0 if projection["proj_score"] is None else projection["proj_score"],
-                "position": all_players[player_id]["position"]
-            }
-            for projection in projections
-        ]
-        for player_id, projections in projections_season.items()
-    }
+    return select_trade_options(season_trade_scores=season_trade_scores, week=week)
 
-    # Drop projections for irrelevant / excluded positions
-    projections_season = {
-        k: v for k, v in projections_season.items()
-        if any([week["position"] in CONFIG["rosters"]["single_positions"] for week in v])
-    }
+def evaluate_trade(
+    league_context: dict,
+    user_id: str,
+    other_id: str,
+    user_sends: List[str],
+    other_sends: List[str],
+    week: int,
+) -> dict:
+    """Gets the average rest-of-season projected scores of both teams before and after a trade
 
-    # Get roster data
-    rosters = get_roster_data(league_id)
-    # Get free agents
-    free_agents = [
-        player_id for player_id in all_players.keys() if not any([
-            player_id in roster["players"] for roster in rosters
-        ])
-    ]
-    # Add projected scores to rosters
-    rosters = add_projected_scores(
-        rosters=rosters,
-        projections=projections_season,
-        free_agents=free_agents,
-    )
+    Parameters
+    ----------
+    league_context : dict
+        Output of get_league_context
+    user_id : str
+        The user id number
+    other_id : str
+        The other user's id number
+    user_sends : List[str]
+        List of player_id the user sends
+    other_sends : List[str]
+        List of player_id the other user sends
+    week : int
+        The current week of the season; used for calculating projected scores for remaining games
 
-    # Get player to trade with
-    other_display_name = st.selectbox("Select user to trade with", [user["display_name"] for user in league_users])
-    other_id = [user["user_id"] for user in league_users if user["display_name"] == other_display_name][0]
+    Returns
+    -------
+    dict
+        Format {
+            "user": Tuple of (original projected score, post-trade projected score)
+            "other": Tuple of (original projected score, post-trade projected score)
+        }
+    """
+    projections_season = league_context["projections"]
+    free_agents = league_context["free_agents"]
 
     # Get user roster and other roster
-    user_roster = [roster for roster in rosters if roster["owner_id"] == user_id][0]
-    other_roster = [roster for roster in rosters if roster["owner_id"] == other_id][0]
-
-    # Select players to trade
-    user_sends = st.multiselect(f"{user_display_name} sends", [all_players[p]["name"] for p in user_roster["players"]])
-    other_sends = st.multiselect(f"{other_display_name} sends", [all_players[p]["name"] for p in other_roster["players"]])
-    user_sends = [p for p in user_roster["players"] if all_players[p]["name"] in user_sends]
-    other_sends = [p for p in other_roster["players"] if all_players[p]["name"] in other_sends]
-
-    # Evaluate scenario
+    user_roster = [roster for roster in league_context["rosters"] if roster["owner_id"] == user_id][0]
+    other_roster = [roster for roster in league_context["rosters"] if roster["owner_id"] == other_id][0]
 
     # Get proposed rosters with the trade
     proposed_user_roster = (set(user_roster["players"]) - set(user_sends)).union(set(other_sends))
     proposed_other_roster = (set(other_roster["players"]) - set(other_sends)).union(set(user_sends))
     # Save original projected scores
-    user_orig_projection = user_roster["proj_score"] / (18 - week)
-    other_orig_projection = other_roster["proj_score"] / (18 - week)
+    user_orig_projection = user_roster["suffix_scores"][week] / (18 - week)
+    other_orig_projection = other_roster["suffix_scores"][week] / (18 - week)
     # Get projected scores with the trade
-    user_proposed_projection = get_projected_score(
+    user_proposed_projection = get_suffix_scores(get_weekly_projected_scores(
         players=list(proposed_user_roster) + free_agents,
         projections=projections_season,
-    ) / (18 - week)
-    other_proposed_projection = get_projected_score(
+    ))[week] / (18 - week)
+    other_proposed_projection = get_suffix_scores(get_weekly_projected_scores(
         players=list(proposed_other_roster) + free_agents,
         projections=projections_season,
-    ) / (18 - week)
+    ))[week] / (18 - week)
 
-    # Return result
     return {
         "user": (user_orig_projection, user_proposed_projection),
         "other": (other_orig_projection, other_proposed_projection),
-        "other_display_name": other_display_name,
-    }
\ No newline at end of file
+    }
+
+def print_progress(
+    fraction: float,
+    text: str,
+):
+    """Outputs trade search status to the terminal, overwriting the previous status line
+
+    Parameters
+    ----------
+    fraction : float
+        Fraction of the search complete
+    text : str
+        Status message
+    """
+    sys.stdout.write("\033[K") # Clear to the end of line
+    print(text, end="\r")
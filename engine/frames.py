@@ -0,0 +1,20 @@
+import pandas as pd
+
+from typing import List
+
+def to_data_frame(
+    trade_options: List[dict],
+) -> pd.DataFrame:
+    """Converts trade options from the headless engine into a data frame
+
+    Parameters
+    ----------
+    trade_options : List[dict]
+        Rows describing trade options, as returned by select_trade_options or get_trade_options
+
+    Returns
+    -------
+    pd.DataFrame
+        Data frame describing the trade options, in the same order
+    """
+    return pd.DataFrame(trade_options)
@@ -0,0 +1,428 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+from datetime import datetime
+from engine.engine import evaluate_trade, get_global_data, get_league_context, get_season_trade_scores, select_trade_options
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from utils.data import SCORE_FIELD_NAMES, get_users
+
+# Warm data kept in memory between queries
+#   global_data: {scoring_type: {"data": output of get_global_data, "signature": cache file signature}}
+#   leagues: {(league_id, scoring_type): {"context": output of get_league_context, "users": league users, "signature": cache file signature}}
+#   trade_scores: {(league_id, user_id, scoring_type, max_group, exclude_positions, player_id): output of get_season_trade_scores}
+_STATE = {
+    "global_data": {},
+    "leagues": {},
+    "trade_scores": {},
+}
+_LOCK = threading.Lock()
+
+def get_cache_signature(
+    scoring_type: str,
+    league_id: str = None,
+) -> tuple:
+    """Gets a signature of the cache files behind the warm data; changes when a file is written or the day rolls over
+
+    Parameters
+    ----------
+    scoring_type : str
+        The league's scoring method; one of "PPR", "Half PPR", "Standard"
+    league_id : str, optional
+        The league id number, to include that league's roster and user files, by default None
+
+    Returns
+    -------
+    tuple
+        The date and the modification time of each relevant cache file (None if it does not exist yet)
+    """
+    date = datetime.now().strftime('%y%m%d')
+    paths = [f"data/players/{date}.json", f"data/projections/{date}_{SCORE_FIELD_NAMES[scoring_type]}.json"]
+    if league_id is not None:
+        paths.extend([f"data/roster_data/{league_id}_{date}.json", f"data/users/{league_id}_{date}.json"])
+
+    return (date, *[os.path.getmtime(path) if os.path.exists(path) else None for path in paths])
+
+def get_warm_global_data(
+    scoring_type: str,
+) -> dict:
+    """Gets the global data for a scoring type from memory, loading it on first use
+
+    Parameters
+    ----------
+    scoring_type : str
+        The league's scoring method; one of "PPR", "Half PPR", "Standard"
+
+    Returns
+    -------
+    dict
+        Output of get_global_data
+    """
+    with _LOCK:
+        entry = _STATE["global_data"].get(scoring_type)
+    if entry is None:
+        # Load outside the lock so queries on warm data are not held up
+        entry = {
+            "data": get_global_data(scoring_type=scoring_type),
+            "signature": get_cache_signature(scoring_type=scoring_type),
+        }
+        with _LOCK:
+            entry = _STATE["global_data"].setdefault(scoring_type, entry)
+
+    return entry["data"]
+
+def get_warm_league(
+    league_id: str,
+    scoring_type: str,
+) -> dict:
+    """Gets a league's context and users from memory, loading them on first use
+
+    Parameters
+    ----------
+    league_id : str
+        The league id number
+    scoring_type : str
+        The league's scoring method; one of "PPR", "Half PPR", "Standard"
+
+    Returns
+    -------
+    dict
+        Format {
+            "context": Output of get_league_context
+            "users": Information about the users in the league; keys user_id and display_name
+            "signature": Cache file signature after loading
+        }
+    """
+    with _LOCK:
+        league = _STATE["leagues"].get((league_id, scoring_type))
+    if league is None:
+        league = load_league(league_id=league_id, scoring_type=scoring_type)
+        with _LOCK:
+            league = _STATE["leagues"].setdefault((league_id, scoring_type), league)
+
+    return league
+
+def load_league(
+    league_id: str,
+    scoring_type: str,
+) -> dict:
+    """Loads a league's context and users
+
+    Parameters
+    ----------
+    league_id : str
+        The league id number
+    scoring_type : str
+        The league's scoring method; one of "PPR", "Half PPR", "Standard"
+
+    Returns
+    -------
+    dict
+        Format {
+            "context": Output of get_league_context
+            "users": Information about the users in the league; keys user_id and display_name
+            "signature": Cache file signature after loading
+        }
+    """
+    context = get_league_context(
+        league_id=league_id,
+        scoring_type=scoring_type,
+        global_data=get_warm_global_data(scoring_type=scoring_type),
+    )
+    users = get_users(league_id)
+
+    return {
+        "context": context,
+        "users": users,
+        "signature": get_cache_signature(scoring_type=scoring_type, league_id=league_id),
+    }
+
+def get_user_id(
+    league_users: List[dict],
+    user: str,
+) -> str:
+    """Gets a user id from either a user id or a display name
+
+    Parameters
+    ----------
+    league_users : List[dict]
+        Information about the users in the league; keys user_id and display_name
+    user : str
+        The user id number or display name
+
+    Returns
+    -------
+    str
+        The user id number
+    """
+    if user in [u["user_id"] for u in league_users]:
+        return user
+    try:
+        return [u["user_id"] for u in league_users if u["display_name"] == user][0]
+    except IndexError:
+        raise ValueError(f"Error: Invalid user name / ID {user}")
+
+def get_week(
+    query: dict,
+) -> int:
+    """Gets the starting week of a query, checking it is a week of the season
+
+    Parameters
+    ----------
+    query : dict
+        Query with key week
+
+    Returns
+    -------
+    int
+        The week
+    """
+    week = int(query["week"])
+    if not 1 <= week <= 17:
+        raise ValueError(f"Error: Week {week} is not between 1 and 17")
+
+    return week
+
+def get_player_ids(
+    query: dict,
+    key: str,
+) -> List[str]:
+    """Gets a list of player ids from a query, checking its type
+
+    Parameters
+    ----------
+    query : dict
+        The query
+    key : str
+        Key of the list of player_id
+
+    Returns
+    -------
+    List[str]
+        The player ids
+    """
+    if not (isinstance(query[key], list) and all([isinstance(p, str) for p in query[key]])):
+        raise ValueError(f"Error: {key} must be a list of player ids")
+
+    return query[key]
+
+def refresh(
+    interval: float,
+):
+    """Reloads warm data in the background whenever its cache files change; runs forever
+
+    Parameters
+    ----------
+    interval : float
+        Seconds between checks of the cache files
+    """
+    while True:
+        time.sleep(interval)
+        try:
+            # Reload global data whose files changed, then every league built on it
+            with _LOCK:
+                stale_scoring_types = [
+                    scoring_type for scoring_type, entry in _STATE["global_data"].items()
+                    if entry["signature"] != get_cache_signature(scoring_type=scoring_type)
+                ]
+            for scoring_type in stale_scoring_types:
+                global_data = get_global_data(scoring_type=scoring_type)
+                with _LOCK:
+                    _STATE["global_data"][scoring_type] = {"data": global_data, "signature": get_cache_signature(scoring_type=scoring_type)}
+                    for key in _STATE["leagues"].keys():
+                        if key[1] == scoring_type:
+                            _STATE["leagues"][key]["signature"] = None
+
+            # Reload leagues whose files (or global data) changed; queries use the old data until the new data is swapped in
+            with _LOCK:
+                stale_leagues = [
+                    key for key, entry in _STATE["leagues"].items()
+                    if entry["signature"] != get_cache_signature(scoring_type=key[1], league_id=key[0])
+                ]
+            for league_id, scoring_type in stale_leagues:
+                league = load_league(league_id=league_id, scoring_type=scoring_type)
+                with _LOCK:
+                    _STATE["leagues"][(league_id, scoring_type)] = league
+                    _STATE["trade_scores"] = {
+                        key: value for key, value in _STATE["trade_scores"].items()
+                        if (key[0], key[2]) != (league_id, scoring_type)
+                    }
+        except Exception as e: # Keep serving the old data and try again next interval
+            print(f"Refresh failed: {e!r}")
+
+def get_rosters(
+    query: dict,
+) -> List[dict]:
+    """Answers a rosters query
+
+    Parameters
+    ----------
+    query : dict
+        Keys league_id, scoring_type
+
+    Returns
+    -------
+    List[dict]
+        List of rosters; keys owner_id, display_name, players (list of player_id, name, position)
+    """
+    league = get_warm_league(league_id=query["league_id"], scoring_type=query["scoring_type"])
+    all_players = league["context"]["all_players"]
+
+    return [
+        {
+            "owner_id": roster["owner_id"],
+            "display_name": ([u["display_name"] for u in league["users"] if u["user_id"] == roster["owner_id"]] + [None])[0],
+            "players": [
+                {"player_id": p, "name": all_players[p]["name"], "position": all_players[p]["position"]}
+                for p in roster["players"]
+            ],
+        }
+        for roster in league["context"]["rosters"]
+    ]
+
+def score_trade(
+    query: dict,
+) -> dict:
+    """Answers a score trade query
+
+    Parameters
+    ----------
+    query : dict
+        Keys league_id, scoring_type, week, user_id, other_id (ids or display names), user_sends, other_sends (lists of player_id)
+
+    Returns
+    -------
+    dict
+        Output of evaluate_trade
+    """
+    league = get_warm_league(league_id=query["league_id"], scoring_type=query["scoring_type"])
+    user_id = get_user_id(league["users"], query["user_id"])
+    other_id = get_user_id(league["users"], query["other_id"])
+    if user_id == other_id:
+        raise ValueError("Error: user_id and other_id must be different users")
+
+    # Check each side only sends players from its own roster
+    roster_players = {roster["owner_id"]: roster["players"] for roster in league["context"]["rosters"]}
+    sends = {user_id: get_player_ids(query, "user_sends"), other_id: get_player_ids(query, "other_sends")}
+    for owner_id, player_ids in sends.items():
+        if owner_id not in roster_players:
+            raise ValueError(f"Error: No roster for user {owner_id}")
+        not_on_roster = [p for p in player_ids if p not in roster_players[owner_id]]
+        if len(not_on_roster) > 0:
+            raise ValueError(f"Error: Players {not_on_roster} are not on the roster of user {owner_id}")
+
+    return evaluate_trade(
+        league_context=league["context"],
+        user_id=user_id,
+        other_id=other_id,
+        user_sends=sends[user_id],
+        other_sends=sends[other_id],
+        week=get_week(query),
+    )
+
+def get_best_trades(
+    query: dict,
+) -> List[dict]:
+    """Answers a best trades query; the search for each player is run once and then served for any week
+
+    Parameters
+    ----------
+    query : dict
+        Keys league_id, scoring_type, week, user_id (id or display name), player_id (sent or received), and optionally
+        max_group (default 1), exclude_positions (default [])
+
+    Returns
+    -------
+    List[dict]
+        Output of select_trade_options
+    """
+    week = get_week(query)
+    league = get_warm_league(league_id=query["league_id"], scoring_type=query["scoring_type"])
+    user_id = get_user_id(league["users"], query["user_id"])
+    key = (
+        query["league_id"],
+        user_id,
+        query["scoring_type"],
+        int(query.get("max_group", 1)),
+        tuple(query.get("exclude_positions", [])),
+        query["player_id"],
+    )
+
+    with _LOCK:
+        season_trade_scores = _STATE["trade_scores"].get(key)
+    if season_trade_scores is None:
+        season_trade_scores = get_season_trade_scores(
+            league_id=query["league_id"],
+            user_id=user_id,
+            scoring_type=query["scoring_type"],
+            max_group=int(query.get("max_group", 1)),
+            league_users=league["users"],
+            exclude_positions=list(query.get("exclude_positions", [])),
+            league_context=league["context"],
+            player_id=query["player_id"],
+        )
+        # Only keep the result if the league was not refreshed during the search
+        with _LOCK:
+            if _STATE["leagues"].get((query["league_id"], query["scoring_type"])) is league:
+                _STATE["trade_scores"][key] = season_trade_scores
+
+    return select_trade_options(season_trade_scores=season_trade_scores, week=week)
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """Serves JSON queries; GET /health, POST /rosters, /score_trade, /best_trades"""
+
+    routes = {
+        "/rosters": get_rosters,
+        "/score_trade": score_trade,
+        "/best_trades": get_best_trades,
+    }
+
+    def send_json(self, status: int, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self.send_json(200, {"status": "ok"})
+        else:
+            self.send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path not in self.routes:
+            self.send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            query = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            self.send_json(200, self.routes[self.path](query))
+        except (AssertionError, IndexError, KeyError, ValueError) as e:
+            self.send_json(400, {"error": repr(e)})
+        except Exception as e: # Answer rather than dropping the connection
+            self.send_json(500, {"error": repr(e)})
+
+def main():
+
+    # Parse arguments
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--host", help="Address to listen on", default="127.0.0.1")
+    arg_parser.add_argument("--port", help="Port to listen on", default=8765)
+    arg_parser.add_argument("--refresh_interval", help="Seconds between checks for changed cache files", default=30)
+
+    args = arg_parser.parse_args()
+
+    # Reload warm data in the background when cache files change
+    threading.Thread(target=refresh, args=(float(args.refresh_interval),), daemon=True).start()
+
+    # Serve queries
+    server = ThreadingHTTPServer((args.host, int(args.port)), RequestHandler)
+    print(f"Serving on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
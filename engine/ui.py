@@ -0,0 +1,139 @@
+import json
+import streamlit as st
+import urllib.error
+
+from engine import client
+from engine.engine import evaluate_trade, get_league_context
+from typing import Callable, List
+
+def get_streamlit_progress() -> Callable[[float, str], None]:
+    """Creates a Streamlit progress bar and returns a trade search progress callback that updates it
+
+    Returns
+    -------
+    Callable[[float, str], None]
+        Progress callback for get_season_trade_scores / get_trade_options
+    """
+    progress_bar = st.progress(0)
+
+    def progress(fraction: float, text: str):
+        progress_bar.progress(fraction, text=text)
+
+    return progress
+
+def show_server_error(
+    error: urllib.error.URLError,
+):
+    """Shows an evaluation server error in the app and stops the script run
+
+    Parameters
+    ----------
+    error : urllib.error.URLError
+        Error raised by a client call; an HTTPError carries the server's JSON error message
+    """
+    if isinstance(error, urllib.error.HTTPError):
+        try:
+            message = json.load(error)["error"]
+        except (ValueError, KeyError):
+            message = f"{error.code} {error.reason}"
+        st.error(f"Evaluation server error: {message}")
+    else:
+        st.error(f"Could not reach the evaluation server: {error.reason}")
+    st.stop()
+
+def evaluate_scenario(
+    league_id: str,
+    user_id: str,
+    week: int,
+    scoring_type: str,
+    league_users: List[dict],
+    user_display_name: str,
+    server_url: str = None,
+) -> dict:
+    """Lets the user pick a trade with Streamlit widgets and evaluates it
+
+    Parameters
+    ----------
+    league_id : str
+        The league id number
+    user_id : str
+        The user id number
+    week : int
+        The current week of the season; used for calculating projected scores for remaining games
+    scoring_type : str
+        The league's scoring method; one of "PPR", "Half PPR", "Standard"
+    league_users : List[dict]
+        Information about the users in the league; keys user_id and display_name
+    user_display_name : str
+        The user's display name
+    server_url : str, optional
+        Address of a running evaluation server to query instead of loading the league locally, by default None
+
+    Returns
+    -------
+    dict
+        Format {
+            "user": Tuple of (original projected score, post-trade projected score)
+            "other": Tuple of (original projected score, post-trade projected score)
+            "other_display_name": Other user's display name
+        }
+    """
+
+    # Get league data
+    if server_url is None:
+        league_context = get_league_context(league_id=league_id, scoring_type=scoring_type)
+        all_players = league_context["all_players"]
+        rosters = league_context["rosters"]
+    else:
+        try:
+            rosters = client.get_rosters(server_url=server_url, league_id=league_id, scoring_type=scoring_type)
+        except urllib.error.URLError as e:
+            show_server_error(e)
+        all_players = {p["player_id"]: p for roster in rosters for p in roster["players"]}
+        rosters = [{"owner_id": roster["owner_id"], "players": [p["player_id"] for p in roster["players"]]} for roster in rosters]
+
+    # Get player to trade with
+    other_display_name = st.selectbox("Select user to trade with", [user["display_name"] for user in league_users])
+    other_id = [user["user_id"] for user in league_users if user["display_name"] == other_display_name][0]
+
+    # Get user roster and other roster
+    user_roster = [roster for roster in rosters if roster["owner_id"] == user_id][0]
+    other_roster = [roster for roster in rosters if roster["owner_id"] == other_id][0]
+
+    # Select players to trade
+    user_sends = st.multiselect(f"{user_display_name} sends", [all_players[p]["name"] for p in user_roster["players"]])
+    other_sends = st.multiselect(f"{other_display_name} sends", [all_players[p]["name"] for p in other_roster["players"]])
+    user_sends = [p for p in user_roster["players"] if all_players[p]["name"] in user_sends]
+    other_sends = [p for p in other_roster["players"] if all_players[p]["name"] in other_sends]
+
+    # Evaluate scenario
+    if server_url is None:
+        result = evaluate_trade(
+            league_context=league_context,
+            user_id=user_id,
+            other_id=other_id,
+            user_sends=user_sends,
+            other_sends=other_sends,
+            week=week,
+        )
+    else:
+        try:
+            result = client.score_trade(
+                server_url=server_url,
+                league_id=league_id,
+                scoring_type=scoring_type,
+                week=week,
+                user_id=user_id,
+                other_id=other_id,
+                user_sends=user_sends,
+                other_sends=other_sends,
+            )
+        except urllib.error.URLError as e:
+            show_server_error(e)
+
+    # Return result
+    return {
+        "user": result["user"],
+        "other": result["other"],
+        "other_display_name": other_display_name,
+    }
@@ -1,8 +1,265 @@
 import argparse
 import ast
+import csv
+import gc
+import json
+import os
+import resource
+import sys
+import time
 
 from datetime import datetime
-from engine.engine import get_trade_options
+from engine.engine import get_global_data, get_season_trade_scores, get_trade_option_columns, merge_season_trade_scores, print_progress, select_trade_options
+from typing import List
+from utils.data import SCORE_FIELD_NAMES, get_all_players, get_roster_data, get_users
+from utils.timing import get_formatted_time
+
+# League-independent data loaded once by the batch parent, keyed by scoring type; inherited read-only by forked workers
+_GLOBAL_DATA = {}
+
+def save_trade_options(
+    season_trade_scores: dict,
+    week: int,
+    path: str,
+):
+    """Saves the trade options for a week as a CSV report (just the header row if there are none)
+
+    Parameters
+    ----------
+    season_trade_scores : dict
+        Output of get_season_trade_scores or merge_season_trade_scores
+    week : int
+        The current week of the season; used for calculating projected scores for remaining games
+    path : str
+        Path of the report
+    """
+    trade_options = select_trade_options(season_trade_scores=season_trade_scores, week=week)
+
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=get_trade_option_columns(season_trade_scores["user_display_name"]), lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(trade_options)
+
+def get_job_name(job: dict) -> str:
+    """Gets a file name stem that identifies a batch job, so reports of jobs with different settings never collide
+
+    Parameters
+    ----------
+    job : dict
+        Batch job; keys league_id, username, week, scoring_type, max_group, exclude
+
+    Returns
+    -------
+    str
+        Name of the form {league_id}_{username}_week{week}_{scoring_type}_max{max_group}[_exclude-{positions}]
+    """
+    name = f"{job['league_id']}_{job['username']}_week{job['week']}_{job['scoring_type'].replace(' ', '-')}_max{job['max_group']}"
+    if len(job["exclude"]) > 0:
+        name += f"_exclude-{'-'.join(sorted(job['exclude']))}"
+
+    return name
+
+def run_job(job: dict) -> dict:
+    """Generates and saves the trade report for one batch job, using the global data loaded by the parent process
+
+    Parameters
+    ----------
+    job : dict
+        Batch job; keys dest, league_id, username, week, scoring_type, max_group, exclude
+
+    Returns
+    -------
+    dict
+        Format {
+            "name": Name of the job
+            "path": Path of the saved report, None if the job failed
+            "error": Description of the error, None if the job succeeded
+        }
+    """
+    t0 = time.time()
+
+    # Catch errors per job so one bad manifest row does not stop the batch
+    try:
+        # Get options
+        season_trade_scores = get_season_trade_scores(
+            league_id=job["league_id"],
+            user_id=job["username"], # ID can be parsed if display name passed in
+            scoring_type=job["scoring_type"],
+            max_group=int(job["max_group"]),
+            league_users=get_users(job["league_id"]),
+            exclude_positions=job["exclude"],
+            global_data=_GLOBAL_DATA[job["scoring_type"]],
+            first_week=int(job["week"]),
+        )
+
+        # Save results
+        path = f"{job['dest']}/{datetime.now().strftime('%y%m%d')}_{get_job_name(job)}_report.csv"
+        save_trade_options(season_trade_scores=season_trade_scores, week=int(job["week"]), path=path)
+    except Exception as e:
+        print(f"({get_formatted_time(time.time() - t0)}) Failed {get_job_name(job)}: {e!r}")
+        return {"name": get_job_name(job), "path": None, "error": repr(e)}
+
+    print(f"({get_formatted_time(time.time() - t0)}) Saved {path}")
+
+    return {"name": get_job_name(job), "path": path, "error": None}
+
+def run_batch(
+    manifest: str,
+    dest: str,
+    week: int,
+    max_group: int,
+    exclude: list,
+    processes: int,
+) -> List[dict]:
+    """Runs every job in a manifest in a process pool, loading the global player and projection data only once
+
+    Parameters
+    ----------
+    manifest : str
+        Path to a JSON list of jobs; keys league_id, username, scoring_type, and optionally max_group, week, exclude
+    dest : str
+        Output destination
+    week : int
+        Default week number for jobs that do not set one
+    max_group : int
+        Default maximum trade group size for jobs that do not set one
+    exclude : list
+        Default positions to exclude for jobs that do not set them
+    processes : int
+        Number of worker processes
+
+    Returns
+    -------
+    List[dict]
+        Results of the failed jobs, as returned by run_job
+    """
+    t0 = time.time()
+
+    # Read manifest and fill in defaults
+    with open(manifest) as file:
+        jobs = json.load(file)
+    jobs = [
+        {
+            "dest": dest,
+            "league_id": str(job["league_id"]),
+            "username": job["username"],
+            "scoring_type": job["scoring_type"],
+            "week": job.get("week", week),
+            "max_group": job.get("max_group", max_group),
+            "exclude": job.get("exclude", exclude),
+        }
+        for job in jobs
+    ]
+    # Reject jobs that would write the same report
+    names = [get_job_name(job) for job in jobs]
+    duplicates = sorted(set([name for name in names if names.count(name) > 1]))
+    assert len(duplicates) == 0, f"Error: Duplicate jobs in manifest {duplicates}"
+
+    results = []
+    try:
+        # Load global data once per scoring type, all sharing one copy of the players; a scoring type that is
+        # unknown or fails to load only fails its own jobs
+        scoring_types = set([job["scoring_type"] for job in jobs])
+        load_errors = {
+            scoring_type: f"Error: Unknown scoring type {scoring_type!r}, expected one of {list(SCORE_FIELD_NAMES.keys())}"
+            for scoring_type in scoring_types if scoring_type not in SCORE_FIELD_NAMES
+        }
+        try:
+            all_players = get_all_players()
+        except Exception as e:
+            load_errors.update({scoring_type: repr(e) for scoring_type in scoring_types if scoring_type not in load_errors})
+        for scoring_type in scoring_types:
+            if scoring_type in load_errors:
+                continue
+            try:
+                _GLOBAL_DATA[scoring_type] = get_global_data(scoring_type=scoring_type, all_players=all_players)
+            except Exception as e:
+                load_errors[scoring_type] = repr(e)
+        for job in jobs:
+            if job["scoring_type"] in load_errors:
+                print(f"Failed {get_job_name(job)}: {load_errors[job['scoring_type']]}")
+                results.append({"name": get_job_name(job), "path": None, "error": load_errors[job["scoring_type"]]})
+        jobs_to_run = [job for job in jobs if job["scoring_type"] not in load_errors]
+
+        # Fetch league data once per league so workers only read the cached files
+        for league_id in set([job["league_id"] for job in jobs_to_run]):
+            try:
+                get_users(league_id)
+                get_roster_data(league_id)
+            except Exception:
+                pass # The league's jobs hit and report the same error
+
+        # Move loaded data out of garbage collection tracking so forked workers keep sharing its pages
+        gc.freeze()
+
+        # Forked workers inherit the global data copy-on-write rather than reloading it
+        import multiprocessing # Only needed in batch mode, so keep it off the startup path
+        with multiprocessing.get_context("fork").Pool(processes=processes) as pool:
+            for result in pool.imap_unordered(run_job, jobs_to_run, chunksize=1):
+                results.append(result)
+    finally:
+        # Report failures, wall time and peak resident memory (ru_maxrss is in kilobytes on Linux)
+        failed = [result for result in results if result["error"] is not None]
+        parent_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        worker_peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        print(f"Finished {len(results) - len(failed)} of {len(jobs)} jobs in {get_formatted_time(time.time() - t0)}")
+        for result in failed:
+            print(f"Failed {result['name']}: {result['error']}")
+        print(f"Peak memory: parent {round(parent_peak, 1)} MB, largest worker {round(worker_peak, 1)} MB")
+
+    return failed
+
+def get_shard_path(
+    dest: str,
+    run: dict,
+    shard: int,
+    num_shards: int,
+) -> str:
+    """Gets the path of the partial result file for one shard; the name identifies the search, so searches sharing a dest do not collide
+
+    Parameters
+    ----------
+    dest : str
+        Output destination
+    run : dict
+        Search parameters; keys league_id, username, week, scoring_type, max_group, exclude
+    shard : int
+        Index of the shard
+    num_shards : int
+        Number of shards
+
+    Returns
+    -------
+    str
+        Path of the partial result file
+    """
+    return f"{dest}/{get_job_name(run)}_shard_{shard}_of_{num_shards}.json"
+
+def load_shard(
+    path: str,
+) -> dict:
+    """Loads the season trade scores saved by one shard
+
+    Parameters
+    ----------
+    path : str
+        Path of the partial result file
+
+    Returns
+    -------
+    dict
+        Season trade scores, as returned by get_season_trade_scores
+    """
+    with open(path) as file:
+        season_trade_scores = json.load(file)
+
+    # JSON object keys are strings, so restore integer weeks
+    season_trade_scores["user_suffix_scores"] = {int(w): v for w, v in season_trade_scores["user_suffix_scores"].items()}
+    for trade in season_trade_scores["trades"]:
+        for key in ["user_suffix_scores", "other_orig_suffix_scores", "other_suffix_scores"]:
+            trade[key] = {int(w): v for w, v in trade[key].items()}
+
+    return season_trade_scores
 
 def main():
 
@@ -15,22 +272,88 @@ def main():
     arg_parser.add_argument("-s", "--scoring_type", help="Scoring type")
     arg_parser.add_argument("--max_group", help="Maximum trade group size", default=2)
     arg_parser.add_argument("--exclude", help="Positions to exclude from analysis", default="[]")
+    arg_parser.add_argument("-m", "--manifest", help="JSON list of jobs to run as a batch instead of a single league")
+    arg_parser.add_argument("-p", "--processes", help="Number of worker processes for batch mode", default=os.cpu_count())
+    arg_parser.add_argument("--shard", help="Index of the shard of the trade space to evaluate (0 to num_shards - 1)")
+    arg_parser.add_argument("--num_shards", "--num-shards", help="Number of shards the trade space is split into", default=1)
+    arg_parser.add_argument("--merge", help="Merge the partial results of all shards into the final report", action="store_true")
 
     args = arg_parser.parse_args()
 
+    # Run batch of jobs
+    if args.manifest is not None:
+        failed = run_batch(
+            manifest=args.manifest,
+            dest=args.dest,
+            week=args.week,
+            max_group=args.max_group,
+            exclude=ast.literal_eval(args.exclude),
+            processes=int(args.processes),
+        )
+        if len(failed) > 0:
+            sys.exit(1)
+        return
+
+    # Search parameters shared by every shard of a run
+    run = {
+        "league_id": args.league_id,
+        "username": args.username,
+        "week": int(args.week),
+        "scoring_type": args.scoring_type,
+        "max_group": int(args.max_group),
+        "exclude": sorted(ast.literal_eval(args.exclude)),
+    }
+
+    # Evaluate one shard and save its partial result
+    if args.shard is not None:
+        season_trade_scores = get_season_trade_scores(
+            league_id=args.league_id,
+            user_id=args.username, # ID can be parsed if display name passed in
+            scoring_type=args.scoring_type,
+            max_group=int(args.max_group),
+            exclude_positions=ast.literal_eval(args.exclude),
+            progress=print_progress,
+            shard=int(args.shard),
+            num_shards=int(args.num_shards),
+            first_week=int(args.week),
+        )
+        season_trade_scores["run"] = run
+        season_trade_scores["shard"] = int(args.shard)
+        season_trade_scores["num_shards"] = int(args.num_shards)
+        # Write then rename, so a merge on the shared filesystem never reads a half-written file
+        path = get_shard_path(dest=args.dest, run=run, shard=int(args.shard), num_shards=int(args.num_shards))
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(season_trade_scores, file)
+        os.replace(f"{path}.tmp", path)
+        return
+
+    # Merge the partial results of all shards
+    if args.merge:
+        paths = [get_shard_path(dest=args.dest, run=run, shard=shard, num_shards=int(args.num_shards)) for shard in range(int(args.num_shards))]
+        missing = [path for path in paths if not os.path.exists(path)]
+        assert len(missing) == 0, f"Error: Missing shard results {missing}"
+        partial_trade_scores = [load_shard(path) for path in paths]
+        # Check every shard is from this search
+        for shard, partial in enumerate(partial_trade_scores):
+            assert partial["run"] == run, f"Error: Shard {shard} is from a different search {partial['run']}"
+            assert (partial["shard"], partial["num_shards"]) == (shard, int(args.num_shards)), f"Error: {paths[shard]} holds shard {partial['shard']} of {partial['num_shards']}"
+        season_trade_scores = merge_season_trade_scores(partial_trade_scores)
+        save_trade_options(season_trade_scores=season_trade_scores, week=int(args.week), path=f"{args.dest}/{datetime.now().strftime('%y%m%d')}_report.csv")
+        return
+
     # Get options
-    trade_options = get_trade_options(
+    season_trade_scores = get_season_trade_scores(
         league_id=args.league_id,
         user_id=args.username, # ID can be parsed if display name passed in
-        week=int(args.week),
         scoring_type=args.scoring_type,
         max_group=int(args.max_group),
         exclude_positions=ast.literal_eval(args.exclude),
-        status="terminal",
+        progress=print_progress,
+        first_week=int(args.week),
     )
 
     # Save results
-    trade_options.to_csv(f"{args.dest}/{datetime.now().strftime('%y%m%d')}_report.csv", index=False)
+    save_trade_options(season_trade_scores=season_trade_scores, week=int(args.week), path=f"{args.dest}/{datetime.now().strftime('%y%m%d')}_report.csv")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
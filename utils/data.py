@@ -3,10 +3,16 @@ import json
 import os
 
 from datetime import datetime
-from sleeper.api.unofficial import UPlayerAPIClient
-from sleeper.enum import Sport
 from typing import List
 
+# Projection stats field for each league scoring type
+SCORE_FIELD_NAMES = {
+    "PPR": "pts_ppr",
+    "Half PPR": "pts_half_ppr",
+    "Standard": "pts_std",
+}
+
+
 def clean(s: str) -> str:
     """Cleans a string returned from a sleeper api call
 
@@ -126,17 +132,17 @@ def get_all_player_projections(
     List[dict]
         List of projections for each week/player; keys week, player_id, proj_score
     """
-    # Check for current data
-    if f"{datetime.now().strftime('%y%m%d')}.json" in os.listdir("data/projections/"):
-        with open(f"data/projections/{datetime.now().strftime('%y%m%d')}.json") as file:
+    # Get data field name given scoring type
+    score_field_name = SCORE_FIELD_NAMES[scoring_type]
+
+    # Check for current data (cached separately for each scoring type)
+    if f"{datetime.now().strftime('%y%m%d')}_{score_field_name}.json" in os.listdir("data/projections/"):
+        with open(f"data/projections/{datetime.now().strftime('%y%m%d')}_{score_field_name}.json") as file:
             return json.load(file)
 
-    # Get data field name given scoring type
-    score_field_name = {
-        "PPR": "pts_ppr",
-        "Half PPR": "pts_half_ppr",
-        "Standard": "pts_std",
-    }[scoring_type]
+    # Only needed when the projections are not cached yet, so keep it off the startup path
+    from sleeper.api.unofficial import UPlayerAPIClient
+    from sleeper.enum import Sport
 
     # Get projections for the rest of the season
     all_player_projections = []
@@ -172,7 +178,7 @@ def get_all_player_projections(
             })
 
     # Dump data
-    with open(f"data/projections/{datetime.now().strftime('%y%m%d')}.json", "w") as file:
+    with open(f"data/projections/{datetime.now().strftime('%y%m%d')}_{score_field_name}.json", "w") as file:
         json.dump(all_player_projections_restr, file)
 
     return all_player_projections_restr
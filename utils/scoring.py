@@ -8,7 +8,7 @@ def add_projected_scores(
     projections: dict,
     free_agents: List[str],
 ) -> List[dict]:
-    """Adds projected score for the remainder of the season as a key to a list of rosters
+    """Adds rest-of-season projected scores, keyed by starting week, to a list of rosters
 
     Parameters
     ----------
@@ -22,16 +22,18 @@ def add_projected_scores(
     Returns
     -------
     List[dict]
-        List of rosters with rest-of-season projected scored added as a key; keys owner_id, players, proj_score
+        List of rosters with rest-of-season projected scores added as a key; keys owner_id, players, suffix_scores
     """
     rosters = [
         {
             "owner_id": roster["owner_id"],
             "players": roster["players"],
-            "proj_score": get_projected_score(
-                players=roster["players"] + free_agents,
-                projections=projections,
-            )
+            "suffix_scores": get_suffix_scores(
+                get_weekly_projected_scores(
+                    players=roster["players"] + free_agents,
+                    projections=projections,
+                )
+            ),
         }
         for roster in rosters
     ]
@@ -39,11 +41,53 @@ def add_projected_scores(
     return rosters
 
 
-def get_projected_score(
+def get_relevant_free_agents(
+    free_agents: List[str],
+    projections: dict,
+) -> List[str]:
+    """Drops free agents that could never be in a lineup, which leaves every projected score unchanged
+
+    In any week, a position fills at most its own slots plus the flex slots it is eligible for,
+    so only that many of the best free agents at the position can ever start, whatever the roster.
+
+    Parameters
+    ----------
+    free_agents : List[str]
+        List of player_id of free agents in the league
+    projections : dict
+        Dictionary mapping player_id to week, proj_score, position
+
+    Returns
+    -------
+    List[str]
+        List of player_id of free agents that are among the best at their position in at least one week
+    """
+
+    # Get the number of lineup slots each position can fill
+    slots = dict(CONFIG["rosters"]["single_positions"])
+    for position, count in CONFIG["rosters"]["flex_positions"].items():
+        for p in ast.literal_eval(position):
+            slots[p] = slots.get(p, 0) + count
+
+    # Restructure to {(week, position): [(proj_score, player_id)]}
+    projections_by_week = {}
+    for player_id in free_agents:
+        for projection in projections.get(player_id, []):
+            projections_by_week.setdefault((projection["week"], projection["position"]), []).append((projection["proj_score"], player_id))
+
+    # Keep the best free agents for every week / position
+    relevant = set()
+    for (week, position), scores in projections_by_week.items():
+        relevant.update([player_id for _, player_id in sorted(scores, reverse=True)[:slots.get(position, 0)]])
+
+    return [player_id for player_id in free_agents if player_id in relevant]
+
+
+def get_weekly_projected_scores(
     players: List[str],
     projections: dict,
-) -> float:
-    """Gets the projected score for a given team of players for the remainder of the season
+) -> dict:
+    """Gets the projected lineup score for a given team of players for each week with projections
 
     Parameters
     ----------
@@ -54,8 +98,8 @@ def get_projected_score(
 
     Returns
     -------
-    float
-        The total projected rest-of-season score for the available roster of players
+    dict
+        Dictionary mapping week to the projected score of the best lineup for that week
     """
     
     # Filter projections to relevant roster of players
@@ -76,13 +120,40 @@ def get_projected_score(
             projections_by_week[projection["week"]][projection["position"]].append(projection["proj_score"])
 
     # For each week, get projected team score
-    projections_by_week = [
-        get_one_projected_score(projections_by_week[week])
+    return {
+        week: get_one_projected_score(projections_by_week[week])
         for week in projections_by_week.keys()
-    ]
+    }
+
+
+def get_suffix_scores(
+    weekly_scores: dict,
+    last_week: int = 17,
+    first_week: int = 1,
+) -> dict:
+    """Gets the rest-of-season projected score for every possible starting week
+
+    Parameters
+    ----------
+    weekly_scores : dict
+        Dictionary mapping week to projected score, as returned by get_weekly_projected_scores
+    last_week : int, optional
+        The final week of the season, by default 17
+    first_week : int, optional
+        The earliest starting week to include, by default 1
+
+    Returns
+    -------
+    dict
+        Dictionary mapping starting week (first_week through last_week + 1) to the total projected score from that week on
+    """
+    suffix_scores = {last_week + 1: 0.0}
+
+    # Accumulate from the end of the season backwards
+    for week in range(last_week, first_week - 1, -1):
+        suffix_scores[week] = suffix_scores[week + 1] + weekly_scores.get(week, 0.0)
 
-    # Return sum of week scores
-    return sum(projections_by_week)
+    return suffix_scores
 
 def get_one_projected_score(
     projections_dict: dict,